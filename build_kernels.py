@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""main_KENKYU1.py の Numba カーネルを事前(AOT)コンパイルし、
+同じディレクトリに force_kernels 拡張モジュールを生成する。
+
+    python build_kernels.py
+"""
+
+import os
+from numba.pycc import CC
+
+from main_KENKYU1 import _KERNELS
+
+cc = CC("force_kernels")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+for name, (func, sig) in _KERNELS.items():
+    cc.export(name, sig)(func)
+
+if __name__ == "__main__":
+    cc.compile()
@@ -6,42 +6,197 @@ from tkinter import ttk, filedialog, messagebox
 import pandas as pd
 import numpy as np
 import os
+import math
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import xlsxwriter
 
 # -------------------------------------------------------------------
 # CSV Utilities
 # -------------------------------------------------------------------
 
-def _load_csv(path: str) -> pd.DataFrame:
-    """Read CSV and return cleaned DataFrame for analysis."""
-    df = pd.read_csv(path, header=4)
-
-    # Drop unit row if present
-    if df.shape[0] > 0 and str(df.iloc[0, 0]).startswith("DataUnit"):
-        df = df.drop(index=0).reset_index(drop=True)
+# 解析に用いる元の列名 → 標準化後の列名
+_COLUMN_MAP = {
+    "Unnamed: 1": "Time",  # 時間列
+    "FY[1]": "Force.Fy.1",
+    "FZ[2]": "Force.Fz.2",
+}
+_CSV_CHUNK_ROWS = 200_000  # 分割読み込みの1チャンクあたりの行数
+
+
+def _load_csv_arrays(path: str) -> dict[str, np.ndarray]:
+    """Read CSV and return each analysis column as a writable float64 array."""
+    # 先頭1行だけ読み、列の位置とヘッダー直後の単位行(DataUnit)の有無を調べる
+    head = pd.read_csv(path, header=4, nrows=1)
+    has_unit_row = head.shape[0] > 0 and str(head.iloc[0, 0]).startswith("DataUnit")
+    missing = [c for c in _COLUMN_MAP if c not in head.columns]
+    if missing:
+        raise ValueError(f"必要な列がありません: {missing}")
+
+    try:
+        df = _read_columns_pyarrow(path, head.columns, has_unit_row)
+    except Exception:
+        # pyarrow が無い・読めない場合は C パーサで読み込む
+        return _read_columns_c(path, has_unit_row)
+
+    # copy=True: DataFrame から切り離した書き込み可能な配列にする
+    # （Numbaカーネルのシグネチャは書き込み可能な float64[:] を前提とする）
+    return {name: df[col].to_numpy(dtype=np.float64, copy=True) for col, name in _COLUMN_MAP.items()}
+
+
+def _read_columns_pyarrow(path: str, columns: pd.Index, has_unit_row: bool) -> pd.DataFrame:
+    """Read the analysis columns with the pyarrow CSV reader."""
+    # pyarrow は空のヘッダー名を "Unnamed: n" に変換せず、skiprows も行数指定のみのため、
+    # ヘッダー行と単位行を行数で読み飛ばし、列は位置で指定する
+    names = sorted(_COLUMN_MAP, key=columns.get_loc)
+    df = pd.read_csv(
+        path,
+        header=None,
+        skiprows=6 if has_unit_row else 5,
+        usecols=[columns.get_loc(c) for c in names],
+        dtype=np.float64,
+        engine="pyarrow",
+    )
+    df.columns = names
+    return df
 
-    # Remove redundant label column
-    if "DataLabel" in df.columns:
-        df = df.drop(columns=["DataLabel"])
 
-    # Standardize column names
-    rename_map = {
-        "Unnamed: 1": "Time",  # 時間列
-        "FY[1]": "Force.Fy.1",
-        "FZ[2]": "Force.Fz.2",
-    }
-    df = df.rename(columns=rename_map)
+def _read_columns_c(path: str, has_unit_row: bool) -> dict[str, np.ndarray]:
+    """Read the analysis columns with the C parser, chunk by chunk into preallocated arrays."""
+    # 改行数からデータ行数の上限を求め、列ごとの出力配列を先に確保する
+    # （LF / CRLF / CR のいずれの改行でも数えられるよう LF と CR の多い方を使う）
+    n_lf = n_cr = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            n_lf += block.count(b"\n")
+            n_cr += block.count(b"\r")
+    n_lines = max(n_lf, n_cr)
+    out = {name: np.empty(n_lines + 1, dtype=np.float64) for name in _COLUMN_MAP.values()}
+
+    # 必要な3列のみをfloat64として分割して読み込む（単位行はパース前に読み飛ばす）。
+    # 各チャンクは出力配列へ書き写してすぐ捨てるので、同時に保持するのは1チャンク分だけ
+    # CR のみの改行では C パーサの skiprows の行番号がずれるため、
+    # ユニバーサル改行モードで開いたハンドルを渡し、改行を LF にそろえてから読む
+    n = 0
+    with open(path, encoding="utf-8", newline=None) as f:
+        reader = pd.read_csv(
+            f,
+            header=4,
+            skiprows=[5] if has_unit_row else None,
+            usecols=list(_COLUMN_MAP),
+            dtype=np.float64,
+            engine="c",
+            chunksize=_CSV_CHUNK_ROWS,
+        )
+        with reader:
+            for chunk in reader:
+                m = len(chunk)
+                for col, name in _COLUMN_MAP.items():
+                    out[name][n:n+m] = chunk[col].to_numpy()
+                n += m
+    return {name: arr[:n] for name, arr in out.items()}
 
-    # 数値変換（念のため）
-    df = df.apply(pd.to_numeric, errors='coerce')
+# -------------------------------------------------------------------
+# Excel Utilities
+# -------------------------------------------------------------------
 
-    # "Time"列があれば、それを"sec"としてインデックスに設定
-    if "Time" in df.columns:
-        df = df.set_index("Time")
-        df.index.name = "sec"
+def _write_results_xlsx(path: str, rows: list[dict]) -> None:
+    """Write result dicts to an .xlsx file, streaming one row at a time."""
+    # 列は全結果のキーを出現順に並べる（pd.DataFrame(rows) と同じ並び）
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+
+    # constant_memory: 書き終えた行から順にディスクへ出力し、ブック全体をメモリに保持しない。
+    # このモードでは行順に書く必要があるため、列単位で書く DataFrame.to_excel は使わない。
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        sheet = workbook.add_worksheet()
+        # DataFrame.to_excel と同じヘッダー書式（太字・罫線・中央揃え）
+        header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        sheet.write_row(0, 0, columns, header_format)
+        for r, row in enumerate(rows, start=1):
+            for c, col in enumerate(columns):
+                value = row.get(col)
+                if value is None or (isinstance(value, float) and math.isnan(value)):
+                    continue  # 欠損は空セル（to_excel の na_rep='' と同じ）
+                if isinstance(value, float) and math.isinf(value):
+                    value = "inf" if value > 0 else "-inf"  # to_excel の inf_rep と同じ
+                sheet.write(r, c, value)
+    finally:
+        workbook.close()
 
-    return df
+# -------------------------------------------------------------------
+# Numba Kernels
+# -------------------------------------------------------------------
+# build_kernels.py で事前コンパイルした force_kernels 拡張モジュールがあればそれを使う。
+# 無い場合はシグネチャを明示してインポート時にJITコンパイルし（cache=Trueでディスクにも保存）、
+# 最初の「分析実行」クリックでコンパイル待ちが発生しないようにする。
+
+def _first_last_above_impl(a, thr):
+    """|a| が thr を超える最初と最後のインデックスを返す（無ければ -1）。"""
+    n = a.shape[0]
+    s = -1
+    e = -1
+    for i in range(n):
+        v = a[i]
+        if v < 0:
+            v = -v
+        if v > thr:
+            s = i
+            break
+    if s == -1:
+        return s, e
+    for i in range(n - 1, s - 1, -1):
+        v = a[i]
+        if v < 0:
+            v = -v
+        if v > thr:
+            e = i
+            break
+    return s, e
+
+
+def _first_above_impl(a, thr, start):
+    """start 以降で a が thr を超える最初のインデックスを返す（無ければ -1）。"""
+    for i in range(start, a.shape[0]):
+        if a[i] > thr:
+            return i
+    return -1
+
+
+def _trapz_abs_uniform_impl(y, dt):
+    """等間隔 dt でサンプリングされた |y| を台形則で積分する。"""
+    n = y.shape[0]
+    if n < 2:
+        return 0.0
+    s = 0.0
+    a0 = y[0] if y[0] >= 0 else -y[0]
+    for i in range(1, n):
+        a1 = y[i] if y[i] >= 0 else -y[i]
+        s += a0 + a1
+        a0 = a1
+    return 0.5 * dt * s
+
+
+# 公開名 -> (Python実装, シグネチャ)。build_kernels.py からも参照する
+_KERNELS = {
+    "first_last_above": (_first_last_above_impl, "UniTuple(int64, 2)(float64[:], float64)"),
+    "first_above": (_first_above_impl, "int64(float64[:], float64, int64)"),
+    "trapz_abs_uniform": (_trapz_abs_uniform_impl, "float64(float64[:], float64)"),
+}
+
+try:
+    from force_kernels import (
+        first_last_above as _first_last_above,
+        first_above as _first_above,
+        trapz_abs_uniform as _trapz_abs_uniform,
+    )
+except ImportError:
+    from numba import njit
+
+    _first_last_above, _first_above, _trapz_abs_uniform = (
+        njit(sig, cache=True)(func) for func, sig in _KERNELS.values()
+    )
 
 # ===================================================================
 # I. パラメータ定義 (Parameter Definitions)
@@ -50,6 +205,8 @@ SAMPLING_RATE = 1000.0
 FORCE_THRESHOLD_N = 10.0
 BASELINE_PERIOD_S = 1.0
 FOOT_CONTACT_SD_FACTOR = 5.0
+PLOT_MAX_POINTS = 2000  # 全体波形（灰色）の描画に使う最大点数
+LOAD_POLL_INTERVAL_MS = 50  # バックグラウンド読み込みの完了確認間隔
 
 # ===================================================================
 # II. GUIアプリケーションクラス (GUI Application Class)
@@ -64,7 +221,13 @@ class ForceAnalysisApp:
         # --- データ管理 ---
         self.results_data = []
         self.current_analysis_result = None
-        self.df = None
+        self.channels = {}  # 列名 -> 波形データ (ndarray)
+        self._abs = {}  # 列名 -> 力の絶対値 (ndarray, _abs_buf のビュー)
+        self._abs_buf = {}  # 列名 -> 絶対値用の再利用バッファ
+
+        # --- バックグラウンド処理 ---
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_load = None  # 読み込み〜分析中の Future（None 以外なら実行中）
 
         # --- スタイル設定 ---
         self._setup_styles()
@@ -106,6 +269,28 @@ class ForceAnalysisApp:
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(fill=tk.BOTH, expand=True)
 
+        # --- blit用の状態 ---
+        self._bg = None       # 背景（全体波形・軸）のピクセルバッファ
+        self._bg_key = None   # 背景を描いたときの (ファイル, モード, 列)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+        # --- グラフのアーティスト（作成は一度だけ、分析ごとにデータを差し替える） ---
+        self._line_bg, = self.ax.plot([], [], color='gray')
+        self._line_hi, = self.ax.plot([], [], color='dodgerblue', linewidth=2, animated=True)
+        self._vl_s = self.ax.axvline(0, color='green', linestyle='--', animated=True)
+        self._vl_e = self.ax.axvline(0, color='red', linestyle='--', animated=True)
+        self._span = self.ax.axvspan(0, 0, color='dodgerblue', alpha=0.1, animated=True)
+        self._legend = self.ax.legend([self._line_bg, self._vl_s, self._vl_e], ["", "", ""])
+        self._legend.set_animated(True)
+        # 分析ごとに描き替える前景（最初の分析までは非表示）
+        self._overlay = [self._span, self._line_hi, self._vl_s, self._vl_e, self._legend]
+        for artist in self._overlay:
+            artist.set_visible(False)
+
+        self.ax.set_xlabel("時間 (s)")
+        self.ax.set_ylabel("力 (N)")
+        self.ax.grid(True, linestyle=':')
+
         # --- 下部：結果とデータ管理 ---
         bottom_panel = ttk.Frame(main_frame)
         bottom_panel.pack(fill=tk.X)
@@ -161,6 +346,7 @@ class ForceAnalysisApp:
         )
         if filepath:
             self.filepath.set(filepath)
+            self._bg_key = None  # 新しいファイルでは背景を描き直す
             self.file_label.config(text=f"{os.path.basename(filepath)}")
 
     def run_analysis(self):
@@ -172,44 +358,80 @@ class ForceAnalysisApp:
         if not self.filepath.get():
             messagebox.showerror("入力エラー", "分析するCSVファイルを選択してください。")
             return
-        
-        # データ読み込み
-        try:
-            # Excelで5行目がヘッダー(DataLabel)
-            self.df = _load_csv(self.filepath.get())
-        except Exception as e:
-            messagebox.showerror("ファイル読込エラー", f"ファイルの読み込みに失敗しました。\nエラー: {e}")
-            return
-            
-        # 分析モードに応じて処理を分岐
+        if self._pending_load is not None:
+            return  # 読み込み・分析中の再クリックは無視
+
+        # 読み込み中に入力が変更されても影響しないよう、クリック時の値を確定させる
+        subject = self.subject_name.get()
         mode = self.analysis_mode.get()
-        if mode == "LMJ":
-            self.analyze_lmj()
-        elif mode == "投球":
-            self.analyze_throwing()
+        path = self.filepath.get()
+
+        # データ読み込み（GUIが固まらないようワーカースレッドで実行）
+        self._pending_load = self._executor.submit(self._load_data, path)
+        self.root.after(LOAD_POLL_INTERVAL_MS, self._poll_load, subject, mode, path)
+
+    def _poll_load(self, subject, mode, path):
+        """読み込みの完了を待ち、完了したらメインスレッドで分析を実行"""
+        future = self._pending_load
+        if not future.done():
+            self.root.after(LOAD_POLL_INTERVAL_MS, self._poll_load, subject, mode, path)
+            return
+
+        # 分析が終わるまで _pending_load を残し、次の読み込みを受け付けない。
+        # 候補選択ダイアログ中に再読み込みされると、self._abs が参照する
+        # 再利用バッファ(_abs_buf)がワーカースレッドで上書きされるため。
+        try:
+            try:
+                self.channels, self._abs = future.result()
+            except Exception as e:
+                messagebox.showerror("ファイル読込エラー", f"ファイルの読み込みに失敗しました。\nエラー: {e}")
+                return
 
-    def analyze_lmj(self):
+            # 分析モードに応じて処理を分岐（候補選択ダイアログ等のTk操作を含むためメインスレッドで行う）
+            if mode == "LMJ":
+                self.analyze_lmj(subject, mode, path)
+            elif mode == "投球":
+                self.analyze_throwing(subject, mode, path)
+        finally:
+            self._pending_load = None
+
+    def _load_data(self, path):
+        """CSVを読み込み、波形データと力の絶対値を返す（ワーカースレッドで実行）"""
+        # Excelで5行目がヘッダー(DataLabel)
+        channels = _load_csv_arrays(path)
+
+        # 力の列の絶対値を再利用バッファに計算（|F| を使うのは LMJ・投球とも軸足の Fy.1 のみ。
+        # 踏み込み足の Fz.2 は符号付きのまま使う）
+        abs_cache = {}
+        for col in ('Force.Fy.1',):
+            if col not in channels:
+                continue
+            src = channels[col]
+            n = src.shape[0]
+            buf = self._abs_buf.get(col)
+            if buf is None or buf.size < n:
+                buf = self._abs_buf[col] = np.empty(n, dtype=np.float64)
+            abs_cache[col] = np.fabs(src, out=buf[:n])
+        return channels, abs_cache
+
+    def analyze_lmj(self, subject, mode, path):
         """LMJの分析ロジック"""
         force_col = 'Force.Fy.1'
         time_col = 'Time'
-        if force_col not in self.df.columns or time_col not in self.df.columns:
+        if force_col not in self.channels or time_col not in self.channels:
             messagebox.showerror("エラー", f"必要な列 '{force_col}' または '{time_col}' が見つかりません。")
             return
 
-        force = self.df[force_col].abs()
-        candidates = self.df.index[force > FORCE_THRESHOLD_N].tolist()
-        
-        if not candidates:
+        # 閾値を超えている区間の開始と終了を特定
+        start_idx, end_idx = _first_last_above(self.channels[force_col], FORCE_THRESHOLD_N)
+
+        if start_idx == -1:
             messagebox.showinfo("情報", "分析区間が見つかりませんでした (閾値を超えませんでした)。")
             return
-            
-        # 閾値を超えている区間の開始と終了を特定
-        start_idx = candidates[0]
-        end_idx = candidates[-1]
 
-        self.calculate_and_display(start_idx, end_idx, force_col, time_col)
+        self.calculate_and_display(start_idx, end_idx, force_col, time_col, subject, mode, path)
 
-    def analyze_throwing(self):
+    def analyze_throwing(self, subject, mode, path):
         """投球の分析ロジック"""
         axis_foot_col = 'Force.Fy.1'
         lead_foot_col = 'Force.Fz.2'
@@ -217,58 +439,60 @@ class ForceAnalysisApp:
 
         # 必要な列の存在チェック
         for col in [axis_foot_col, lead_foot_col, time_col]:
-            if col not in self.df.columns:
+            if col not in self.channels:
                 messagebox.showerror("エラー", f"必要な列 '{col}' が見つかりません。")
                 return
 
         # --- 開始点の特定 ---
-        axis_force_abs = self.df[axis_foot_col].abs()
-        start_candidates_idx = np.where(axis_force_abs > FORCE_THRESHOLD_N)[0]
-
-        if len(start_candidates_idx) == 0:
+        above = self._abs[axis_foot_col] > FORCE_THRESHOLD_N
+        if not above.any():
             messagebox.showinfo("情報", "開始点が見つかりませんでした (閾値を超えませんでした)。")
             return
-        
+
+        # 連続して閾値を超えている区間は、その先頭（立ち上がり）だけを候補にする
+        first = int(np.argmax(above))
+        rising = np.flatnonzero(above[first+1:] & ~above[first:-1]) + first + 1
+        start_candidates_idx = np.concatenate(([first], rising))
+
         start_idx = self.choose_index_dialog(start_candidates_idx, "開始点")
         if start_idx is None: return # ユーザーがキャンセルした場合
 
         # --- 終了点（フットコンタクト）の特定 ---
-        lead_force = self.df[lead_foot_col]
+        lead_force = self.channels[lead_foot_col]
         baseline_end_frame = int(BASELINE_PERIOD_S * SAMPLING_RATE)
-        baseline_data = lead_force.iloc[:baseline_end_frame]
-        baseline_mean = baseline_data.mean()
-        baseline_sd = baseline_data.std()
+        baseline_data = lead_force[:baseline_end_frame]
+        baseline_mean = np.nanmean(baseline_data)
+        baseline_sd = np.nanstd(baseline_data, ddof=1)
         contact_threshold = baseline_mean + FOOT_CONTACT_SD_FACTOR * baseline_sd
         
         # 開始点以降で閾値を超えた最初の点
-        end_candidates_idx = np.where(lead_force.iloc[start_idx:] > contact_threshold)[0]
-        if len(end_candidates_idx) == 0:
+        end_idx = _first_above(lead_force, contact_threshold, start_idx)
+        if end_idx == -1:
             messagebox.showinfo("情報", "終了点（フットコンタクト）が見つかりませんでした。")
             return
-
-        # インデックスを元のDataFrameのインデックスに変換
-        end_idx = end_candidates_idx[0] + start_idx
         
-        self.calculate_and_display(start_idx, end_idx, axis_foot_col, time_col)
+        self.calculate_and_display(start_idx, end_idx, axis_foot_col, time_col, subject, mode, path)
 
-    def calculate_and_display(self, start_idx, end_idx, force_col, time_col):
+    def calculate_and_display(self, start_idx, end_idx, force_col, time_col, subject, mode, path):
         """指定された区間で計算、結果表示、グラフ描画を行う"""
-        analysis_df = self.df.iloc[start_idx:end_idx+1]
-        
+        force_data = self.channels[force_col]
+        time_data = self.channels[time_col]
+
         # 計算
-        peak_force = analysis_df[force_col].abs().max()
-        # 力積の計算 (台形則)
-        impulse = np.trapz(y=analysis_df[force_col].abs(), x=analysis_df[time_col])
+        # 欠損(NaN)は pandas の max() と同様に無視する
+        peak_force = float(np.nanmax(self._abs[force_col][start_idx:end_idx+1]))
+        # 力積の計算 (台形則, サンプリング間隔は一定)
+        impulse = _trapz_abs_uniform(force_data[start_idx:end_idx+1], 1.0 / SAMPLING_RATE)
 
         # 結果を辞書に格納
         self.current_analysis_result = {
-            "被験者名": self.subject_name.get(),
-            "分析モード": self.analysis_mode.get(),
-            "ファイル名": os.path.basename(self.filepath.get()),
+            "被験者名": subject,
+            "分析モード": mode,
+            "ファイル名": os.path.basename(path),
             "ピークフォース(N)": round(peak_force, 2),
             "力積(N・s)": round(impulse, 2),
-            "開始時間(s)": self.df.loc[start_idx, time_col],
-            "終了時間(s)": self.df.loc[end_idx, time_col],
+            "開始時間(s)": float(time_data[start_idx]),
+            "終了時間(s)": float(time_data[end_idx]),
         }
 
         # 結果をテキストボックスに表示
@@ -283,38 +507,73 @@ class ForceAnalysisApp:
         self.result_text.config(state="disabled")
 
         # グラフを描画
-        self.plot_waveform(start_idx, end_idx, force_col, time_col)
+        self.plot_waveform(start_idx, end_idx, force_col, time_col, mode, path)
 
-    def plot_waveform(self, start_idx, end_idx, force_col, time_col):
+    def plot_waveform(self, start_idx, end_idx, force_col, time_col, mode, path):
         """波形と分析区間をグラフに描画"""
-        self.ax.clear()
-        
-        time_data = self.df[time_col]
-        force_data = self.df[force_col]
-        start_time = self.df.loc[start_idx, time_col]
-        end_time = self.df.loc[end_idx, time_col]
+        time_data = self.channels[time_col]
+        force_data = self.channels[force_col]
+        start_time = time_data[start_idx]
+        end_time = time_data[end_idx]
+
+        # 背景（全体波形・軸）はファイル/モードが変わったときだけ描き直す
+        bg_key = (path, mode, force_col)
+        redraw_bg = bg_key != self._bg_key
+        if redraw_bg:
+            self._draw_background(time_data, force_data, force_col, mode)
+            self._bg_key = bg_key
 
-        self.ax.plot(time_data, force_data, label=force_col, color='gray')
-        
         # 分析区間の波形をハイライト
-        self.ax.plot(time_data[start_idx:end_idx+1], force_data[start_idx:end_idx+1], color='dodgerblue', linewidth=2)
-        
+        self._line_hi.set_data(time_data[start_idx:end_idx+1], force_data[start_idx:end_idx+1])
+
         # 開始・終了の垂直線
-        self.ax.axvline(x=start_time, color='green', linestyle='--', label=f'開始: {start_time:.3f}s')
-        self.ax.axvline(x=end_time, color='red', linestyle='--', label=f'終了: {end_time:.3f}s')
-        
+        self._vl_s.set_xdata([start_time, start_time])
+        self._vl_e.set_xdata([end_time, end_time])
+
         # 分析区間を塗りつぶし
-        self.ax.fill_between(time_data, self.ax.get_ylim()[0], self.ax.get_ylim()[1], 
-                             where=(time_data >= start_time) & (time_data <= end_time), 
-                             color='dodgerblue', alpha=0.1)
+        self._span.set_x(start_time)
+        self._span.set_width(end_time - start_time)
 
-        self.ax.set_title(f"波形グラフ ({self.analysis_mode.get()})")
-        self.ax.set_xlabel("時間 (s)")
-        self.ax.set_ylabel("力 (N)")
-        self.ax.legend()
-        self.ax.grid(True, linestyle=':')
+        legend_texts = self._legend.get_texts()
+        legend_texts[0].set_text(force_col)
+        legend_texts[1].set_text(f'開始: {start_time:.3f}s')
+        legend_texts[2].set_text(f'終了: {end_time:.3f}s')
+
+        for artist in self._overlay:
+            artist.set_visible(True)
+
+        if redraw_bg:
+            # 全体描画。draw_event で背景が保存され、前景も重ねて描かれる
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._bg)
+            self._draw_overlay()
+            self.canvas.blit(self.fig.bbox)
+
+    def _draw_background(self, time_data, force_data, force_col, mode):
+        """全体波形とタイトル・軸範囲など、分析区間に依存しない部分を更新"""
+        # 全体波形は間引いて描画（分析区間のハイライトは元の解像度のまま）
+        step = max(1, len(time_data) // PLOT_MAX_POINTS)
+        self._line_bg.set_data(time_data[::step], force_data[::step])
+
+        # 軸範囲は全体波形だけから決める（前景は一旦非表示にして除外）
+        for artist in self._overlay:
+            artist.set_visible(False)
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+
+        self.ax.set_title(f"波形グラフ ({mode})")
         self.fig.tight_layout()
-        self.canvas.draw()
+
+    def _draw_overlay(self):
+        """前景アーティストを現在のキャンバスに描画"""
+        for artist in self._overlay:
+            self.ax.draw_artist(artist)
+
+    def _on_draw(self, event):
+        """全体再描画（リサイズ等）のたびに背景を保存し直し、前景を重ねる"""
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_overlay()
 
     def choose_index_dialog(self, indices, event_name):
         """複数の候補からユーザーに1つを選択させるダイアログを表示"""
@@ -328,7 +587,7 @@ class ForceAnalysisApp:
         ttk.Label(dialog, text=f"{event_name}の候補が複数見つかりました。").pack(pady=5)
         ttk.Label(dialog, text="使用する時間（秒）を選択してください。").pack(pady=5)
         
-        times = [f"{self.df.loc[i, 'Time']:.4f}" for i in indices]
+        times = np.char.mod("%.4f", self.channels['Time'][indices]).tolist()
         
         selected_time = tk.StringVar()
         combobox = ttk.Combobox(dialog, textvariable=selected_time, values=times, state="readonly")
@@ -338,10 +597,8 @@ class ForceAnalysisApp:
         result_index = tk.IntVar()
 
         def on_ok():
-            chosen_time_str = selected_time.get()
-            chosen_time_float = float(chosen_time_str)
-            # 選択された時間から最も近いインデックスを探す
-            result_index.set(self.df.index[abs(self.df['Time'] - chosen_time_float) < 1e-9][0])
+            # コンボボックスの選択位置がそのまま候補インデックスの位置に対応する
+            result_index.set(int(indices[combobox.current()]))
             dialog.destroy()
             
         def on_cancel():
@@ -382,8 +639,7 @@ class ForceAnalysisApp:
         )
         if filepath:
             try:
-                df_to_export = pd.DataFrame(self.results_data)
-                df_to_export.to_excel(filepath, index=False)
+                _write_results_xlsx(filepath, self.results_data)
                 messagebox.showinfo("成功", f"全{len(self.results_data)}件のデータを\n{filepath}\nに保存しました。")
             except Exception as e:
                 messagebox.showerror("保存エラー", f"Excelファイルの保存に失敗しました。\nエラー: {e}")
@@ -395,6 +651,7 @@ class ForceAnalysisApp:
             "本当に終了していいですか？\nデータの保存は完了していますか？"
         )
         if ok:
+            self._executor.shutdown(wait=False, cancel_futures=True)
             self.root.destroy()
 
 # ===================================================================
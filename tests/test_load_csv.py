@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""CSV読み込み（C パーサ経路）の改行コード別チェック"""
+
+import os
+
+import numpy as np
+import pytest
+
+import main_KENKYU1 as app
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "11_1.csv")
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n", "\r"], ids=["LF", "CRLF", "CR"])
+def test_read_columns_c_line_endings(tmp_path, newline):
+    """どの改行コードでも単位行を正しく読み飛ばし、同じ値を返す"""
+    with open(SAMPLE_CSV, encoding="utf-8") as f:
+        text = f.read()
+    path = tmp_path / "sample.csv"
+    path.write_bytes(text.replace("\n", newline).encode("utf-8"))
+
+    channels = app._read_columns_c(str(path), has_unit_row=True)
+
+    assert channels["Time"].shape == (6000,)
+    assert channels["Time"][0] == 0.0
+    assert channels["Force.Fy.1"][0] == -0.50531
+    assert channels["Force.Fz.2"][0] == 439.981
+    assert channels["Time"][-1] == 5.999
+    assert not np.isnan(channels["Force.Fz.2"]).any()